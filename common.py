@@ -0,0 +1,80 @@
+import logging
+import mmap
+import os
+import sys
+from typing import Any, Dict, List
+
+import boto3
+import orjson
+from botocore.config import Config
+
+
+# Shared by the scanner and remediator: a pool large enough for their thread
+# pools, adaptive retries for throttling, and keep-alive so connections are reused.
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={"mode": "adaptive", "max_attempts": 5},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+# One session per process: credentials are resolved once and shared by every client.
+# Sessions aren't thread-safe, so create clients from it before starting worker threads.
+SESSION = boto3.session.Session()
+
+# Findings files at least this large are parsed straight from a memory map
+MMAP_READ_THRESHOLD = 16 * 1024 * 1024
+
+
+def configure_logging(quiet: bool = False) -> None:
+    """
+    Sends log lines to stdout as plain messages (same look as the old print output).
+    quiet=True keeps only warnings and errors.
+    """
+    logging.basicConfig(
+        level=logging.WARNING if quiet else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
+    # Keep botocore's own INFO lines (e.g. credential lookup) out of the report output
+    for name in ("boto3", "botocore", "urllib3"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def get_bucket_names(s3) -> List[str]:
+    """
+    Returns the names of all buckets visible to the given S3 client.
+    """
+    # ListBuckets pagination needs a recent botocore; fall back to a single call.
+    if s3.can_paginate("list_buckets"):
+        pages = s3.get_paginator("list_buckets").paginate()
+        return [b["Name"] for page in pages for b in page.get("Buckets", [])]
+
+    resp = s3.list_buckets()
+    return [b["Name"] for b in resp.get("Buckets", [])]
+
+
+def read_json(path: str) -> Dict[str, Any]:
+    """
+    Parses a JSON file with orjson in one read.
+    Large files are memory-mapped so they aren't copied into a bytes object first.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_READ_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def write_json(path: str, data: Dict[str, Any], compact: bool = False) -> None:
+    """
+    Serializes data in a single orjson pass.
+    compact=True skips indentation (smaller and faster for machine-read output).
+    """
+    option = orjson.OPT_APPEND_NEWLINE
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=option))
@@ -1,112 +1,316 @@
+import asyncio
 import boto3
-import json
+import logging
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
 
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from google import genai
+from google.genai import types as genai_types
 
+try:
+    import aioboto3
+    from aiobotocore.config import AioConfig
+except ImportError:  # optional: fall back to the thread pool
+    aioboto3 = None
+    AioConfig = None
 
-def lambda_handler(event, context):
-    """Scan S3 buckets for encryption and use AI to explain risks"""
+# The Lambda runtime attaches its own handler to the root logger
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+for _name in ("boto3", "botocore", "urllib3"):
+    logging.getLogger(_name).setLevel(logging.WARNING)
 
-    # Initialize S3 client
-    s3_client = boto3.client("s3")
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+)
 
-    print("Scanning S3 buckets for encryption...")
+# Largest MaxBuckets value ListBuckets accepts
+LIST_BUCKETS_PAGE_SIZE = 10000
 
-    # Get all S3 buckets
-    response = s3_client.list_buckets()
-    buckets = response.get("Buckets", [])
+# Upper bound on concurrent get_bucket_encryption calls
+MAX_SCAN_WORKERS = 32
 
-    print(f"Found {len(buckets)} buckets to scan\n")
+# Use aioboto3 (when installed) once an account has at least this many buckets
+ASYNC_SCAN_THRESHOLD = 50
+ASYNC_SCAN_CONCURRENCY = 50
 
-    scan_results = []
+ASYNC_S3_CLIENT_CONFIG = (
+    AioConfig(
+        max_pool_connections=ASYNC_SCAN_CONCURRENCY,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+    )
+    if AioConfig is not None
+    else None
+)
 
-    for bucket in buckets:
-        bucket_name = bucket["Name"]
+# Cap on the Gemini request so a slow reply can't use up the Lambda timeout
+AI_TIMEOUT_MS = 10_000
 
-        # Check if bucket has encryption enabled
-        encrypted = False
-        encryption_type = "None"
+# Created at init time so warm Lambda invocations reuse the session and connections
+_SESSION = boto3.session.Session()
+_S3 = _SESSION.client("s3", config=S3_CLIENT_CONFIG)
 
-        try:
-            enc = s3_client.get_bucket_encryption(Bucket=bucket_name)
-            rules = enc.get("ServerSideEncryptionConfiguration", {}).get("Rules", [])
-
-            if rules:
-                algo = (
-                    rules[0]
-                    .get("ApplyServerSideEncryptionByDefault", {})
-                    .get("SSEAlgorithm")
-                )
-                if algo:
-                    encrypted = True
-                    encryption_type = algo
-        except s3_client.exceptions.ServerSideEncryptionConfigurationNotFoundError:
-            encrypted = False
-            encryption_type = "None"
-        except Exception as e:
-            # Don't fail the whole scan if one bucket errors
-            encrypted = False
-            encryption_type = f"Error: {type(e).__name__}"
-            print(f"Error checking encryption for {bucket_name}: {e}")
-
-        scan_results.append(
-            {
-                "bucket_name": bucket_name,
-                "encrypted": encrypted,
-                "encryption_type": encryption_type,
-            }
+# Clients for buckets outside the function's region, keyed by region name
+_REGIONAL_CLIENTS = {}
+
+# Bucket regions resolved by earlier invocations (bucket names are global)
+_BUCKET_REGIONS = {}
+
+_GENAI_CLIENT = (
+    genai.Client(
+        api_key=os.environ["GOOGLE_API_KEY"],
+        http_options=genai_types.HttpOptions(timeout=AI_TIMEOUT_MS),
+    )
+    if os.environ.get("GOOGLE_API_KEY")
+    else None
+)
+
+
+def list_buckets(s3_client):
+    """List all buckets, following pagination when botocore supports it"""
+
+    # Not cached: a warm Lambda must still see buckets created since the last run.
+    # PageSize sends MaxBuckets; S3 only includes BucketRegion when a parameter is given.
+    if s3_client.can_paginate("list_buckets"):
+        pages = s3_client.get_paginator("list_buckets").paginate(
+            PaginationConfig={"PageSize": LIST_BUCKETS_PAGE_SIZE}
         )
+        return [bucket for page in pages for bucket in page.get("Buckets", [])]
 
-        status = "Encrypted" if encrypted else "Not Encrypted"
-        print(f"{status}: {bucket_name} ({encryption_type})")
+    return s3_client.list_buckets().get("Buckets", [])
 
-    # Count unencrypted buckets
-    unencrypted = [r for r in scan_results if not r["encrypted"]]
-    unencrypted_count = len(unencrypted)
-    unencrypted_buckets = [r["bucket_name"] for r in unencrypted]
 
-    print("\nAnalyzing security findings with Gemini AI...")
+def _encryption_algorithm(enc):
+    """Return the default SSE algorithm from a get_bucket_encryption response, or None"""
 
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        ai_analysis = "AI analysis skipped: GOOGLE_API_KEY not configured"
-    else:
+    rules = enc.get("ServerSideEncryptionConfiguration", {}).get("Rules", [])
+    if not rules:
+        return None
+    return rules[0].get("ApplyServerSideEncryptionByDefault", {}).get("SSEAlgorithm")
+
+
+def _scan_entry(bucket_name, encrypted, encryption_type):
+    """Log one bucket's status and build its scan_results entry"""
+
+    status = "Encrypted" if encrypted else "Not Encrypted"
+    logger.info(f"{status}: {bucket_name} ({encryption_type})")
+
+    return {
+        "bucket_name": bucket_name,
+        "encrypted": encrypted,
+        "encryption_type": encryption_type,
+    }
+
+
+def _error_entry(bucket_name, e):
+    """Build the scan_results entry for a failed get_bucket_encryption call"""
+
+    if isinstance(e, ClientError):
+        # Read the code instead of formatting the exception (e.g. AccessDenied)
+        code = e.response.get("Error", {}).get("Code", "Unknown")
+        if code == "ServerSideEncryptionConfigurationNotFoundError":
+            return _scan_entry(bucket_name, False, "None")
+        logger.error(f"Error checking encryption for {bucket_name}: ClientError: {code}")
+        return _scan_entry(bucket_name, False, f"Error: {code}")
+
+    # Don't fail the whole scan if one bucket errors
+    logger.error(f"Error checking encryption for {bucket_name}: {e}")
+    return _scan_entry(bucket_name, False, f"Error: {type(e).__name__}")
+
+
+def check_bucket(s3_client, bucket_name):
+    """Check default encryption for one bucket and return its scan_results entry"""
+
+    try:
+        algo = _encryption_algorithm(s3_client.get_bucket_encryption(Bucket=bucket_name))
+    except Exception as e:
+        return _error_entry(bucket_name, e)
+
+    return _scan_entry(bucket_name, bool(algo), algo or "None")
+
+
+async def check_bucket_async(s3_client, bucket_name, semaphore):
+    """Async version of check_bucket for an aioboto3 client"""
+
+    async with semaphore:
         try:
-            client = genai.Client(api_key=api_key)
+            algo = _encryption_algorithm(await s3_client.get_bucket_encryption(Bucket=bucket_name))
+        except Exception as e:
+            return _error_entry(bucket_name, e)
+
+    return _scan_entry(bucket_name, bool(algo), algo or "None")
+
+
+def _normalize_region(location_constraint):
+    """Map a LocationConstraint value to a region name"""
+
+    # us-east-1 buckets report no constraint; "EU" is the legacy name for eu-west-1
+    if not location_constraint:
+        return "us-east-1"
+    if location_constraint == "EU":
+        return "eu-west-1"
+    return location_constraint
+
+
+def _bucket_location(bucket_name):
+    """Look up one bucket's region, or None if it can't be read"""
+
+    try:
+        resp = _S3.get_bucket_location(Bucket=bucket_name)
+    except Exception as e:
+        logger.info(f"Could not get region for {bucket_name}, using default client: {type(e).__name__}")
+        return None
+    return _normalize_region(resp.get("LocationConstraint"))
+
 
-            prompt = f"""You are an AWS security expert. Analyze this S3 encryption scan and provide a brief security assessment.
+def resolve_bucket_regions(buckets):
+    """Return {bucket_name: region or None} for the buckets from list_buckets"""
 
-Scan Results:
-- Total Buckets: {len(buckets)}
-- Encrypted: {len(buckets) - unencrypted_count}
-- Unencrypted: {unencrypted_count}
-- Unencrypted Bucket Names: {', '.join(unencrypted_buckets) if unencrypted_buckets else 'None'}
+    # list_buckets() requests BucketRegion; fall back to the warm-start cache, then
+    # get_bucket_location only for buckets whose region is still unknown
+    regions = {b["Name"]: b.get("BucketRegion") or _BUCKET_REGIONS.get(b["Name"]) for b in buckets}
+    missing = [name for name, region in regions.items() if not region]
+    if missing:
+        max_workers = min(MAX_SCAN_WORKERS, len(missing))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            regions.update(zip(missing, executor.map(_bucket_location, missing)))
 
-Provide a 2-3 sentence analysis:
-1. What's the security risk of unencrypted buckets?
-2. What encryption should be enabled? (AES256 or aws:kms)
-3. What action should the user take immediately?
+    _BUCKET_REGIONS.update((name, region) for name, region in regions.items() if region)
+    return regions
 
-Be concise and actionable."""
-            resp = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
+
+def regional_client(region):
+    """S3 client for a region, cached so warm invocations reuse its connections"""
+
+    if not region or region == _S3.meta.region_name:
+        return _S3
+    if region not in _REGIONAL_CLIENTS:
+        _REGIONAL_CLIENTS[region] = _SESSION.client("s3", region_name=region, config=S3_CLIENT_CONFIG)
+    return _REGIONAL_CLIENTS[region]
+
+
+def scan_buckets_threaded(bucket_names, regions):
+    """Check buckets on a thread pool; map() keeps results in bucket order"""
+
+    # Clients are built here, before the workers start, so the cache isn't raced
+    s3_clients = [regional_client(regions.get(name)) for name in bucket_names]
+
+    max_workers = max(1, min(MAX_SCAN_WORKERS, len(bucket_names)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(check_bucket, s3_clients, bucket_names))
+
+
+async def scan_buckets_async(bucket_names, regions):
+    """Check buckets on one event loop; gather() keeps results in bucket order"""
+
+    semaphore = asyncio.Semaphore(ASYNC_SCAN_CONCURRENCY)
+    session = aioboto3.Session()
+    async with AsyncExitStack() as stack:
+        # One client per bucket region (None = the function's own region)
+        s3_clients = {}
+        for region in set(regions.get(name) for name in bucket_names):
+            s3_clients[region] = await stack.enter_async_context(
+                session.client("s3", region_name=region, config=ASYNC_S3_CLIENT_CONFIG)
             )
-            ai_analysis = resp.text
+
+        return await asyncio.gather(
+            *(
+                check_bucket_async(s3_clients[regions.get(name)], name, semaphore)
+                for name in bucket_names
+            )
+        )
+
+
+def build_prompt(total_buckets, encrypted_count, unencrypted_buckets):
+    """Build the Gemini prompt as a list of lines joined once"""
+
+    lines = [
+        "You are an AWS security expert. Analyze this S3 encryption scan and provide a brief security assessment.",
+        "",
+        "Scan Results:",
+        f"- Total Buckets: {total_buckets}",
+        f"- Encrypted: {encrypted_count}",
+        f"- Unencrypted: {len(unencrypted_buckets)}",
+        "- Unencrypted Bucket Names: " + (", ".join(unencrypted_buckets) or "None"),
+        "",
+        "Provide a 2-3 sentence analysis:",
+        "1. What's the security risk of unencrypted buckets?",
+        "2. What encryption should be enabled? (AES256 or aws:kms)",
+        "3. What action should the user take immediately?",
+        "",
+        "Be concise and actionable.",
+    ]
+    return "\n".join(lines)
+
+
+def call_gemini(prompt):
+    """Ask Gemini for the security summary (bounded by AI_TIMEOUT_MS)"""
+
+    resp = _GENAI_CLIENT.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=prompt,
+    )
+    return resp.text
+
+
+def lambda_handler(event, context):
+    """Scan S3 buckets for encryption and use AI to explain risks"""
+
+    logger.info("Scanning S3 buckets for encryption...")
+
+    # Get all S3 buckets
+    buckets = list_buckets(_S3)
+
+    logger.info(f"Found {len(buckets)} buckets to scan\n")
+
+    bucket_names = [bucket["Name"] for bucket in buckets]
+
+    # Send each request to the bucket's own region to avoid a 301/307 redirect round-trip
+    regions = resolve_bucket_regions(buckets)
+
+    # Threads are just as fast for small accounts; switch to asyncio for large fan-out
+    if aioboto3 is not None and len(bucket_names) >= ASYNC_SCAN_THRESHOLD:
+        scan_results = asyncio.run(scan_buckets_async(bucket_names, regions))
+    else:
+        scan_results = scan_buckets_threaded(bucket_names, regions)
+
+    # Collect unencrypted bucket names in one pass
+    unencrypted_buckets = []
+    for r in scan_results:
+        if not r["encrypted"]:
+            unencrypted_buckets.append(r["bucket_name"])
+    unencrypted_count = len(unencrypted_buckets)
+    total = len(buckets)
+    encrypted_count = total - unencrypted_count
+
+    if unencrypted_count == 0:
+        # Nothing to explain, so don't pay for an LLM round-trip
+        ai_analysis = "All scanned buckets are encrypted; no action required."
+    elif _GENAI_CLIENT is None:
+        ai_analysis = "AI analysis skipped: GOOGLE_API_KEY not configured"
+    else:
+        logger.info("\nAnalyzing security findings with Gemini AI...")
+
+        try:
+            ai_analysis = call_gemini(build_prompt(total, encrypted_count, unencrypted_buckets))
 
         except Exception as e:
             ai_analysis = f"AI analysis failed: {str(e)}"
 
     result = {
-        "total_buckets": len(buckets),
+        "total_buckets": total,
         "unencrypted_buckets": unencrypted_count,
-        "encrypted_buckets": len(buckets) - unencrypted_count,
+        "encrypted_buckets": encrypted_count,
         "scan_results": scan_results,
         "ai_analysis": ai_analysis,
         "alert": unencrypted_count > 0,
     }
 
-    print(f"\nScan complete: {unencrypted_count}/{len(buckets)} buckets need encryption")
+    logger.info(f"\nScan complete: {unencrypted_count}/{total} buckets need encryption")
 
-    return {"statusCode": 200, "body": json.dumps(result)}
+    return {"statusCode": 200, "body": orjson.dumps(result).decode()}
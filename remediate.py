@@ -1,11 +1,17 @@
 import argparse
-import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 from typing import Any, Dict, List, Optional
 
-import boto3
 from botocore.exceptions import ClientError
 
+from common import S3_CLIENT_CONFIG, SESSION, configure_logging, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
 
 def now_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -18,6 +24,9 @@ DESIRED_PUBLIC_ACCESS_BLOCK = {
     "RestrictPublicBuckets": True,
 }
 
+# Concurrent put_public_access_block calls (kept below the client's connection pool size)
+MAX_REMEDIATION_WORKERS = 16
+
 
 def parse_csv_list(value: Optional[str]) -> Optional[List[str]]:
     if not value:
@@ -26,20 +35,64 @@ def parse_csv_list(value: Optional[str]) -> Optional[List[str]]:
     return items or None
 
 
-def read_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Returns a process-wide S3 client, created on first use.
+    Repeated remediate() calls in one process reuse its connections.
+    """
+    return SESSION.client("s3", config=S3_CLIENT_CONFIG)
+
+
+def _apply_one(s3, finding: Dict[str, Any], approve: bool) -> Dict[str, Any]:
+    """
+    Enforces Block Public Access for one finding (or records a dry run).
+    Returns the action dict for the report.
+    """
+    bucket = finding.get("bucket")
+    issue = finding.get("issue")
+
+    action = {
+        "bucket": bucket,
+        "issue": issue,
+        "action": "put_public_access_block",
+        "requested_config": DESIRED_PUBLIC_ACCESS_BLOCK,
+        "status": "DRY_RUN" if not approve else "PENDING",
+        "error": None,
+    }
 
+    if not bucket:
+        action["status"] = "SKIPPED"
+        action["error"] = "Missing bucket name in finding."
+        return action
 
-def write_json(path: str, data: Dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    if not approve:
+        logger.info(f"DRY RUN: Would enforce Block Public Access on [{bucket}]")
+        return action
 
+    try:
+        s3.put_public_access_block(
+            Bucket=bucket,
+            PublicAccessBlockConfiguration=DESIRED_PUBLIC_ACCESS_BLOCK,
+        )
+        action["status"] = "APPLIED"
+        logger.info(f"APPLIED: Enforced Block Public Access on [{bucket}]")
 
-def remediate(findings_report: Dict[str, Any], approve: bool, allow_buckets: Optional[List[str]]) -> Dict[str, Any]:
-    s3 = boto3.client("s3")
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "Unknown")
+        action["status"] = "FAILED"
+        action["error"] = {"code": code, "message": e.response.get("Error", {}).get("Message")}
+        logger.error(f"FAILED: [{bucket}] ClientError: {code}")
+
+    except Exception as e:
+        action["status"] = "FAILED"
+        action["error"] = str(e)
+        logger.error(f"FAILED: [{bucket}] {str(e)}")
+
+    return action
 
+
+def remediate(findings_report: Dict[str, Any], approve: bool, allow_buckets: Optional[List[str]]) -> Dict[str, Any]:
     findings: List[Dict[str, Any]] = findings_report.get("findings", [])
     targets = [f for f in findings if f.get("severity") == "CRITICAL"]
 
@@ -48,51 +101,15 @@ def remediate(findings_report: Dict[str, Any], approve: bool, allow_buckets: Opt
 
     actions: List[Dict[str, Any]] = []
 
-    for f in targets:
-        bucket = f.get("bucket")
-        issue = f.get("issue")
-
-        action = {
-            "bucket": bucket,
-            "issue": issue,
-            "action": "put_public_access_block",
-            "requested_config": DESIRED_PUBLIC_ACCESS_BLOCK,
-            "status": "DRY_RUN" if not approve else "PENDING",
-            "error": None,
-        }
-
-        if not bucket:
-            action["status"] = "SKIPPED"
-            action["error"] = "Missing bucket name in finding."
-            actions.append(action)
-            continue
-
-        if not approve:
-            actions.append(action)
-            print(f"DRY RUN: Would enforce Block Public Access on [{bucket}]")
-            continue
-
-        try:
-            s3.put_public_access_block(
-                Bucket=bucket,
-                PublicAccessBlockConfiguration=DESIRED_PUBLIC_ACCESS_BLOCK,
-            )
-            action["status"] = "APPLIED"
-            print(f"APPLIED: Enforced Block Public Access on [{bucket}]")
-
-        except ClientError as e:
-            code = e.response.get("Error", {}).get("Code", "Unknown")
-            action["status"] = "FAILED"
-            action["error"] = {"code": code, "message": e.response.get("Error", {}).get("Message")}
-            print(f"FAILED: [{bucket}] ClientError: {code}")
-
-        except Exception as e:
-            action["status"] = "FAILED"
-            action["error"] = str(e)
-            print(f"FAILED: [{bucket}] {str(e)}")
-
-        actions.append(action)
+    # Only create the client (and thread pool) when there is something to fix.
+    if targets:
+        s3 = get_s3_client()
 
+        # Each PUT is independent; map() returns actions in target order.
+        with ThreadPoolExecutor(max_workers=MAX_REMEDIATION_WORKERS) as ex:
+            actions = list(ex.map(partial(_apply_one, s3, approve=approve), targets))
+
+    counts = Counter(a["status"] for a in actions)
     return {
         "generated_at": now_utc_iso(),
         "service": "s3",
@@ -102,10 +119,10 @@ def remediate(findings_report: Dict[str, Any], approve: bool, allow_buckets: Opt
         "targets": len(targets),
         "actions": actions,
         "summary": {
-            "applied": sum(1 for a in actions if a["status"] == "APPLIED"),
-            "failed": sum(1 for a in actions if a["status"] == "FAILED"),
-            "dry_run": sum(1 for a in actions if a["status"] == "DRY_RUN"),
-            "skipped": sum(1 for a in actions if a["status"] == "SKIPPED"),
+            "applied": counts["APPLIED"],
+            "failed": counts["FAILED"],
+            "dry_run": counts["DRY_RUN"],
+            "skipped": counts["SKIPPED"],
         },
     }
 
@@ -115,6 +132,11 @@ def main() -> int:
     parser.add_argument("--input", default="findings.json", help="Input findings JSON from scanner.")
     parser.add_argument("--output", default="remediation.json", help="Output remediation report JSON.")
     parser.add_argument("--allow-buckets", default=None, help="Comma-separated allowlist of bucket names.")
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only log failures, not per-bucket dry-run/applied lines.",
+    )
     parser.add_argument(
         "--approve",
         action="store_true",
@@ -122,6 +144,8 @@ def main() -> int:
     )
     args = parser.parse_args()
 
+    configure_logging(args.quiet)
+
     allow_buckets = parse_csv_list(args.allow_buckets)
     report = read_json(args.input)
     remediation_report = remediate(report, approve=args.approve, allow_buckets=allow_buckets)
@@ -1,13 +1,55 @@
 import argparse
-import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from enum import IntEnum
+from functools import partial
+from typing import Any, Dict, List, Optional, TypedDict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from common import S3_CLIENT_CONFIG, SESSION, configure_logging, get_bucket_names, write_json
 
-SEVERITY_ORDER = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+logger = logging.getLogger(__name__)
+
+
+class Severity(IntEnum):
+    """
+    Finding severities, ordered so they compare as plain ints.
+    Findings store the member name ("CRITICAL", ...) so the JSON stays readable.
+    """
+
+    NONE = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+
+# PublicAccessBlockConfiguration keys that must all be True
+BLOCK_PUBLIC_ACLS = "BlockPublicAcls"
+IGNORE_PUBLIC_ACLS = "IgnorePublicAcls"
+BLOCK_PUBLIC_POLICY = "BlockPublicPolicy"
+RESTRICT_PUBLIC_BUCKETS = "RestrictPublicBuckets"
+
+# Concurrent get_public_access_block calls (kept below the client's connection pool size)
+MAX_SCAN_WORKERS = 25
+
+
+class _FindingRequired(TypedDict):
+    bucket: str
+    issue: str
+    severity: str
+
+
+class Finding(_FindingRequired, total=False):
+    """
+    One entry in the report's "findings" list.
+    "details" is only present when a bucket could not be scanned.
+    """
+
+    details: Any
 
 
 def now_utc_iso() -> str:
@@ -40,85 +82,81 @@ def evaluate_public_access_block(config: Dict[str, Any]) -> bool:
     """
     Returns True if all 4 protections are enabled.
     """
-    return all(
-        [
-            config.get("BlockPublicAcls") is True,
-            config.get("IgnorePublicAcls") is True,
-            config.get("BlockPublicPolicy") is True,
-            config.get("RestrictPublicBuckets") is True,
-        ]
+    # Chained "and" stops at the first protection that is off.
+    return (
+        config.get(BLOCK_PUBLIC_ACLS) is True
+        and config.get(IGNORE_PUBLIC_ACLS) is True
+        and config.get(BLOCK_PUBLIC_POLICY) is True
+        and config.get(RESTRICT_PUBLIC_BUCKETS) is True
     )
 
 
+def _scan_one(s3, bucket_name: str) -> Optional[Finding]:
+    """
+    Scans a single bucket. Returns a finding dict, or None if the bucket is OK.
+    """
+    try:
+        config = get_public_access_block_config(s3, bucket_name)
+
+        if not evaluate_public_access_block(config):
+            logger.warning(f"CRITICAL: [{bucket_name}] Public access not fully blocked")
+            return {
+                "bucket": bucket_name,
+                "issue": "Public access not fully blocked",
+                "severity": Severity.CRITICAL.name,
+            }
+
+        logger.info(f"[OK]     [{bucket_name}] Public access properly blocked")
+        return None
+
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "Unknown")
+        if code == "NoSuchPublicAccessBlockConfiguration":
+            logger.warning(f"CRITICAL: [{bucket_name}] No public access block configured")
+            return {
+                "bucket": bucket_name,
+                "issue": "No public access block configured",
+                "severity": Severity.CRITICAL.name,
+            }
+
+        # For production you might want to record ACCESS_DENIED as HIGH, etc.
+        logger.error(f"ERROR:   [{bucket_name}] ClientError: {code}")
+        return {
+            "bucket": bucket_name,
+            "issue": f"Could not scan bucket (ClientError: {code})",
+            "severity": Severity.HIGH.name,
+            "details": e.response.get("Error", {}),
+        }
+
+    except Exception as e:
+        logger.error(f"ERROR:   [{bucket_name}] {str(e)}")
+        return {
+            "bucket": bucket_name,
+            "issue": f"Could not scan bucket (Exception)",
+            "severity": Severity.HIGH.name,
+            "details": str(e),
+        }
+
+
 def scan_s3_buckets(allow_buckets: Optional[List[str]] = None) -> Dict[str, Any]:
-    s3 = boto3.client("s3")
-    findings: List[Dict[str, Any]] = []
-
-    print("Scanning S3 buckets for public access...\n")
-
-    buckets = s3.list_buckets()
-    bucket_list = buckets.get("Buckets", [])
-    print(f"Found {len(bucket_list)} buckets (before filtering)\n")
-
-    scanned_count = 0
-
-    for bucket in bucket_list:
-        bucket_name = bucket["Name"]
-
-        if not should_scan_bucket(bucket_name, allow_buckets):
-            continue
-
-        scanned_count += 1
-
-        try:
-            config = get_public_access_block_config(s3, bucket_name)
-
-            if not evaluate_public_access_block(config):
-                findings.append(
-                    {
-                        "bucket": bucket_name,
-                        "issue": "Public access not fully blocked",
-                        "severity": "CRITICAL",
-                    }
-                )
-                print(f"CRITICAL: [{bucket_name}] Public access not fully blocked")
-            else:
-                print(f"[OK]     [{bucket_name}] Public access properly blocked")
-
-        except ClientError as e:
-            code = e.response.get("Error", {}).get("Code", "Unknown")
-            if code == "NoSuchPublicAccessBlockConfiguration":
-                findings.append(
-                    {
-                        "bucket": bucket_name,
-                        "issue": "No public access block configured",
-                        "severity": "CRITICAL",
-                    }
-                )
-                print(f"CRITICAL: [{bucket_name}] No public access block configured")
-            else:
-                # For production you might want to record ACCESS_DENIED as HIGH, etc.
-                findings.append(
-                    {
-                        "bucket": bucket_name,
-                        "issue": f"Could not scan bucket (ClientError: {code})",
-                        "severity": "HIGH",
-                        "details": e.response.get("Error", {}),
-                    }
-                )
-                print(f"ERROR:   [{bucket_name}] ClientError: {code}")
-
-        except Exception as e:
-            findings.append(
-                {
-                    "bucket": bucket_name,
-                    "issue": f"Could not scan bucket (Exception)",
-                    "severity": "HIGH",
-                    "details": str(e),
-                }
-            )
-            print(f"ERROR:   [{bucket_name}] {str(e)}")
+    s3 = SESSION.client("s3", config=S3_CLIENT_CONFIG)
+    findings: List[Finding] = []
+
+    logger.info("Scanning S3 buckets for public access...\n")
+
+    all_bucket_names = get_bucket_names(s3)
+    logger.info(f"Found {len(all_bucket_names)} buckets (before filtering)\n")
 
+    bucket_names = [name for name in all_bucket_names if should_scan_bucket(name, allow_buckets)]
+    scanned_count = len(bucket_names)
+
+    # Each check is an independent network call, so run them concurrently.
+    with ThreadPoolExecutor(max_workers=MAX_SCAN_WORKERS) as ex:
+        results = list(ex.map(partial(_scan_one, s3), bucket_names))
+
+    findings.extend(r for r in results if r is not None)
+
+    counts = Counter(f.get("severity", Severity.NONE.name) for f in findings)
     report: Dict[str, Any] = {
         "generated_at": now_utc_iso(),
         "service": "s3",
@@ -127,58 +165,70 @@ def scan_s3_buckets(allow_buckets: Optional[List[str]] = None) -> Dict[str, Any]
         "findings": findings,
         "summary": {
             "total_findings": len(findings),
-            "critical": sum(1 for f in findings if f.get("severity") == "CRITICAL"),
-            "high": sum(1 for f in findings if f.get("severity") == "HIGH"),
-            "medium": sum(1 for f in findings if f.get("severity") == "MEDIUM"),
-            "low": sum(1 for f in findings if f.get("severity") == "LOW"),
+            "critical": counts[Severity.CRITICAL.name],
+            "high": counts[Severity.HIGH.name],
+            "medium": counts[Severity.MEDIUM.name],
+            "low": counts[Severity.LOW.name],
         },
     }
 
-    print("\n" + "=" * 55)
+    logger.info("\n" + "=" * 55)
     if len(findings) == 0:
-        print("[OK] No security issues found! All scanned buckets are configured.")
+        logger.info("[OK] No security issues found! All scanned buckets are configured.")
     else:
-        print(f"Found {len(findings)} security issue(s):")
+        logger.info(f"Found {len(findings)} security issue(s):")
         for f in findings:
-            print(f"  [{f['severity']}] {f['bucket']}: {f['issue']}")
-    print("=" * 55)
+            logger.info(f"  [{f['severity']}] {f['bucket']}: {f['issue']}")
+    logger.info("=" * 55)
 
     return report
 
 
-def write_json(path: str, data: Dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
-
-
 def main() -> int:
     parser = argparse.ArgumentParser(description="Scan S3 buckets for public access misconfigurations.")
     parser.add_argument("--output", default="findings.json", help="Path to write JSON findings.")
     parser.add_argument("--allow-buckets", default=None, help="Comma-separated allowlist of bucket names.")
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only log findings and errors, not per-bucket OK lines or the summary.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write findings JSON without indentation (for machine-read output).",
+    )
     parser.add_argument(
         "--fail-on",
         default="CRITICAL",
-        choices=["NONE", "LOW", "MEDIUM", "HIGH", "CRITICAL"],
+        choices=[s.name for s in Severity],
         help="Exit non-zero if findings at/above this severity exist. Use NONE to never fail.",
     )
     args = parser.parse_args()
 
+    configure_logging(args.quiet)
+
     allow_buckets = parse_csv_list(args.allow_buckets)
     report = scan_s3_buckets(allow_buckets=allow_buckets)
-    write_json(args.output, report)
+    write_json(args.output, report, compact=args.compact)
 
-    threshold = SEVERITY_ORDER[args.fail_on]
-    if threshold == 0:
+    threshold = Severity[args.fail_on]
+    if threshold == Severity.NONE:
         return 0
 
-    worst = 0
-    for f in report["findings"]:
-        worst = max(worst, SEVERITY_ORDER.get(f.get("severity", "NONE"), 0))
+    findings = report["findings"]
+    total_findings = report["summary"]["total_findings"]
+
+    # Unknown severity strings count as NONE
+    severities = Severity.__members__
+    worst = max(
+        (severities.get(f.get("severity", "NONE"), Severity.NONE) for f in findings),
+        default=Severity.NONE,
+    )
 
     # Convention:
     # 0 = clean, 2 = findings, 1 = runtime error (we don't use 1 here because we record errors as HIGH findings)
-    if worst >= threshold and report["summary"]["total_findings"] > 0:
+    if worst >= threshold and total_findings > 0:
         return 2
 
     return 0